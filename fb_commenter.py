@@ -11,19 +11,108 @@ Supports:
 import os
 import sys
 import time
+import json
 import argparse
+import functools
+from urllib.parse import urlsplit, parse_qs
+import string
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 from dotenv import load_dotenv
 import openai
 
 load_dotenv()
 
+# Chat model used for AI replies
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+# Selectors (Facebook markup changes often; keep them in one place)
+# Facebook text often: "View more comments", "View 1 more comment", "View previous comments", "See more"
+# Also "View replies" so nested comments are seen too.
+_VIEW_MORE_XPATH = (
+    "//span[contains(text(), 'View more') and contains(text(), 'comment')] | "
+    "//span[contains(text(), 'View previous comments')] | "
+    "//span[contains(text(), 'See more')] | "
+    "//div[contains(text(), 'View more comments')] | "
+    "//span[contains(text(), 'View') and contains(text(), 'replies')]"
+)
+_MOST_RELEVANT_XPATH = "//span[contains(text(), 'Most relevant')]"
+_ALL_COMMENTS_XPATH = "//span[contains(text(), 'All comments')]"
+# Expanded selector: Case insensitive "Reply", various roles.
+_REPLY_BUTTON_XPATH = (
+    "//div[@role='button'][translate(text(), 'REPLY', 'reply')='reply'] | "
+    "//span[translate(text(), 'REPLY', 'reply')='reply'] | "
+    "//a[@role='button'][translate(text(), 'REPLY', 'reply')='reply']"
+)
+_PROFILE_INTRO_XPATH = "//span[text()='Intro']/ancestor::div[3]"
+_ARTICLE_CSS = "div[role='article']"
+
+# Waits: we poll for the page to be ready instead of sleeping for the worst case,
+# but always pause at least MIN_WAIT so freshly inserted nodes can settle.
+MIN_WAIT = 0.5
+PAGE_LOAD_TIMEOUT = 15
+CONTENT_RELOAD_TIMEOUT = 4 # Never wait longer than the old fixed sleep after expanding
+PROFILE_LOAD_TIMEOUT = 5 # Same cap as the old fixed sleep; locked/empty profiles never match
+
+_COUNT_ARTICLES_JS = "return document.querySelectorAll(\"div[role='article']\").length;"
+_PAGE_STATE_JS = (
+    "return [document.body.scrollHeight, "
+    "document.querySelectorAll(\"div[role='article']\").length];"
+)
+
+# Evaluates an XPath in the page and returns only rendered matches, so we pay
+# one WebDriver round-trip instead of one is_displayed() call per element.
+_FIND_VISIBLE_JS = """
+const snapshot = document.evaluate(arguments[0], document, null,
+    XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const visible = [];
+for (let i = 0; i < snapshot.snapshotLength; i++) {
+    const el = snapshot.snapshotItem(i);
+    if (el.offsetParent !== null) visible.push(el);
+}
+return visible;
+"""
+
+# Walks up from a Reply button to its comment thread and reports whether one of
+# the author links carries our name. Runs entirely in the page (one round-trip).
+_ALREADY_REPLIED_JS = """
+const name = arguments[1].toLowerCase();
+let parent = arguments[0];
+for (let i = 0; i < 6; i++) {
+    if (!parent.parentElement) break;
+    parent = parent.parentElement;
+    if (parent.getAttribute('role') === 'article') break;
+}
+for (const link of parent.querySelectorAll('a')) {
+    const txt = (link.innerText || '').trim();
+    if (txt.toLowerCase().includes(name) && txt.length < name.length + 5) return true;
+}
+return false;
+"""
+
+# For each Reply button, returns [name, href] of the first author-looking link in
+# the comment that owns it (or null), so all authors are read in one round-trip.
+_COMMENT_AUTHORS_JS = """
+return arguments[0].map(function (btn) {
+    const block = btn.closest("div[role='article']");
+    if (!block) return null;
+    for (const link of block.querySelectorAll('a')) {
+        const href = link.href;
+        const text = (link.innerText || '').trim();
+        if (href && text && text.length > 2 && !href.includes('comment') && !href.includes('photo')) {
+            return [text, href];
+        }
+    }
+    return null;
+});
+"""
+
 def get_config():
     """Load configuration from environment variables."""
     email = os.getenv("FB_EMAIL")
@@ -54,23 +143,109 @@ def setup_driver(debug_address=None):
             print("Ensure Chrome is running with: --remote-debugging-port=9222")
         sys.exit(1)
 
-def get_profile_context(driver, profile_url):
+# Profile contexts scraped so far, keyed by normalized profile URL, as
+# {"context": ..., "scraped_at": unix time}. Successful scrapes are persisted so
+# reruns don't open the same profiles again, until they are older than the TTL
+# (the context includes "Recent Activity", which goes stale).
+PROFILE_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "fbcommenter", "profiles.json")
+PROFILE_CACHE_TTL = 7 * 24 * 3600 # seconds
+PROFILE_CACHE_FAILED_TTL = 10 * 60 # Failed scrapes (never persisted) are retried after this
+_PROFILE_CACHE = None
+
+def _profile_cache_key(profile_url):
     """
-    Opens profile in a new tab, scrapes intro/posts, closes tab.
-    Returns a string of context or None.
+    Normalize a profile URL for the cache: drop Facebook's per-render tracking
+    params, keeping only the 'id' of profile.php links.
+    """
+    parts = urlsplit(profile_url)
+    key = f"{parts.scheme}://{parts.netloc}{parts.path}"
+    if parts.path.endswith("profile.php"):
+        profile_id = parse_qs(parts.query).get("id")
+        if profile_id:
+            key += f"?id={profile_id[0]}"
+    return key
+
+def _is_fresh(entry):
+    """
+    True if a cache entry is well-formed and younger than its TTL
+    (PROFILE_CACHE_FAILED_TTL for failed scrapes, PROFILE_CACHE_TTL otherwise).
+    """
+    try:
+        ttl = PROFILE_CACHE_TTL if entry["context"] else PROFILE_CACHE_FAILED_TTL
+        return time.time() - entry["scraped_at"] < ttl
+    except (TypeError, KeyError):
+        return False
+
+def _load_profile_cache():
+    """Return the in-memory profile cache, reading it from disk on first use."""
+    global _PROFILE_CACHE
+    if _PROFILE_CACHE is None:
+        _PROFILE_CACHE = {}
+        try:
+            with open(PROFILE_CACHE_PATH, encoding="utf-8") as f:
+                _PROFILE_CACHE.update(
+                    (key, entry) for key, entry in json.load(f).items() if _is_fresh(entry))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Could not read profile cache (ignoring): {e}")
+    return _PROFILE_CACHE
+
+def _save_profile_cache():
+    """Write the successfully scraped profile contexts to disk."""
+    try:
+        os.makedirs(os.path.dirname(PROFILE_CACHE_PATH), exist_ok=True)
+        # Write a temp file and swap it in, so a crash mid-write can't truncate the cache
+        tmp_path = PROFILE_CACHE_PATH + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({key: entry for key, entry in _PROFILE_CACHE.items() if entry["context"]}, f)
+        os.replace(tmp_path, PROFILE_CACHE_PATH)
+    except Exception as e:
+        print(f"Could not write profile cache: {e}")
+
+def get_profile_context(driver, profile_url, scrape_handle=None):
+    """
+    Returns the context string for a profile (or None), scraping it only
+    if it isn't cached yet. See _scrape_profile for scrape_handle.
     """
     if not profile_url:
         return None
-        
+    
+    cache = _load_profile_cache()
+    key = _profile_cache_key(profile_url)
+    if key in cache and _is_fresh(cache[key]):
+        print(f"Using cached profile context for {key}")
+        return cache[key]["context"]
+    
+    context = _scrape_profile(driver, profile_url, scrape_handle)
+    cache[key] = {"context": context, "scraped_at": time.time()}
+    if context:
+        _save_profile_cache()
+    return context
+
+def _scrape_profile(driver, profile_url, scrape_handle=None):
+    """
+    Loads profile in the scrape tab (scrape_handle) and scrapes intro/posts.
+    Without a scrape tab, opens a new tab and closes it afterwards.
+    Returns a string of context or None.
+    """
     print(f"Scraping profile: {profile_url} ...")
     original_window = driver.current_window_handle
     context = ""
     
     try:
-        # Open new tab
-        driver.switch_to.new_window('tab')
+        if scrape_handle:
+            driver.switch_to.window(scrape_handle)
+        else:
+            driver.switch_to.new_window('tab')
         driver.get(profile_url)
-        time.sleep(5) # Wait for profile load
+        # Wait for profile load (intro box or first post)
+        try:
+            WebDriverWait(driver, PROFILE_LOAD_TIMEOUT).until(
+                lambda d: d.find_elements(By.CSS_SELECTOR, _ARTICLE_CSS) or d.find_elements(By.XPATH, _PROFILE_INTRO_XPATH))
+        except TimeoutException:
+            print("Profile did not finish loading, scraping what is there.")
+        time.sleep(MIN_WAIT)
         
         # Scrape Intro
         try:
@@ -78,7 +253,7 @@ def get_profile_context(driver, profile_url):
             # Look for typical intro text containers
             # This is fragile. We'll try to get the whole body text and truncate? No, too messy.
             # Let's look for "Intro" header and text following it.
-            intro_elements = driver.find_elements(By.XPATH, "//span[text()='Intro']/ancestor::div[3]")
+            intro_elements = driver.find_elements(By.XPATH, _PROFILE_INTRO_XPATH)
             if intro_elements:
                  intro_text = intro_elements[0].text.replace("\n", " ")
                  context += f"Profile Intro: {intro_text}. "
@@ -90,7 +265,7 @@ def get_profile_context(driver, profile_url):
         try:
             # Look for the first post container. 
             # Posts usually have aria-posinset="1" or are the first div role="article"
-            posts = driver.find_elements(By.XPATH, "//div[@role='article']")
+            posts = driver.find_elements(By.CSS_SELECTOR, _ARTICLE_CSS)
             if posts:
                 # The first one might be the pinning or the intro box depending on layout
                 # We try to get text from the first substantial one
@@ -106,55 +281,103 @@ def get_profile_context(driver, profile_url):
     except Exception as e:
         print(f"Profile scrape failed: {e}")
     finally:
-        # Close tab and return
-        try:
-            driver.close()
-        except:
-            pass
+        # Close tab (unless it's the reusable scrape tab) and return
+        if not scrape_handle:
+            try:
+                driver.close()
+            except:
+                pass
         driver.switch_to.window(original_window)
         
     return context if len(context) > 10 else None
 
+@functools.lru_cache(maxsize=4)
+def _get_openai_client(api_key):
+    """Return a shared OpenAI client so its HTTP connection pool is reused across replies."""
+    # The client retries 429/5xx and connection errors with exponential backoff
+    # (honouring Retry-After), so a transient throttle doesn't cost us the reply.
+    return openai.OpenAI(api_key=api_key, max_retries=3)
+
+# Prompt pieces for the AI reply; only the names/context are filled in per call.
+_SYSTEM_MSG = "You are a friendly personal Facebook user replying to friends or followers."
+_CONTEXT_TPL = string.Template(
+    "Information about the user '$name': $ctx\n"
+    "Use this information to make the reply personal and relevant to them. "
+    "Mention something nice about their profile or recent value if applicable, but keep it natural."
+)
+_PROMPT_TPL = string.Template(
+    "A user named '$name' commented: '$comment'.\n"
+    "$ctx\n"
+    "Write a nice, friendly, and personal reply. "
+    "Do not ask for inquiries, business, or sales. "
+    "Do not sound corporate or like a bot. "
+    "Do not use hashtags. Keep it under 2 sentences."
+)
+
+# Batched variant: one request returns replies for many comments as JSON.
+AI_BATCH_SIZE = 20
+_BATCH_INSTRUCTIONS = (
+    "Below is a JSON list of Facebook comments, each with the commenter's name and, "
+    "when known, information about their profile.\n"
+    "For each one write a nice, friendly, and personal reply. "
+    "If profile information is given, use it to make the reply personal, but keep it natural. "
+    "Do not ask for inquiries, business, or sales. "
+    "Do not sound corporate or like a bot. "
+    "Do not use hashtags. Keep each reply under 2 sentences.\n"
+    'Return a JSON object of the form {"replies": [{"id": <id>, "reply": "<text>"}]}.\n'
+)
+
+# Placeholder sent as the comment text (we don't extract the comment body yet)
+COMMENT_PLACEHOLDER = "(Comment text unavailable)"
+
+def build_reply_prompt(comment_text, author_name, profile_context=None):
+    """Fill in the reply prompt for one comment."""
+    ctx = ""
+    if profile_context:
+        ctx = _CONTEXT_TPL.substitute(name=author_name, ctx=profile_context)
+    return _PROMPT_TPL.substitute(name=author_name, comment=comment_text, ctx=ctx)
+
+def build_messages(prompt):
+    """Wrap a user prompt with the shared system message."""
+    return [
+        {"role": "system", "content": _SYSTEM_MSG},
+        {"role": "user", "content": prompt}
+    ]
+
+@functools.lru_cache(maxsize=512)
+def _cached_ai_reply(comment_text, author_name, api_key, profile_context):
+    """
+    Ask OpenAI for a reply. Memoized so the same author/context isn't sent twice
+    for one post (reply_to_comments clears it per post); errors propagate (and so
+    aren't cached).
+    """
+    client = _get_openai_client(api_key)
+    
+    prompt = build_reply_prompt(comment_text, author_name, profile_context)
+    
+    response = client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=build_messages(prompt),
+        max_tokens=60,
+        temperature=0.7
+    )
+    
+    return _clean_reply(response.choices[0].message.content)
+
+def _clean_reply(reply):
+    """Strip whitespace and any surrounding quotes from a generated reply."""
+    reply = reply.strip()
+    if reply.startswith('"') and reply.endswith('"'):
+        reply = reply[1:-1]
+    return reply
+
 def generate_ai_reply(comment_text, author_name, api_key, profile_context=None):
     """Generate a reply using OpenAI."""
     if not api_key:
         return None
         
     try:
-        client = openai.OpenAI(api_key=api_key)
-        
-        context_instruction = ""
-        if profile_context:
-            context_instruction = (
-                f"Information about the user '{author_name}': {profile_context}\n"
-                f"Use this information to make the reply personal and relevant to them. "
-                f"Mention something nice about their profile or recent value if applicable, but keep it natural."
-            )
-        
-        prompt = (
-            f"A user named '{author_name}' commented: '{comment_text}'.\n"
-            f"{context_instruction}\n"
-            f"Write a nice, friendly, and personal reply. "
-            f"Do not ask for inquiries, business, or sales. "
-            f"Do not sound corporate or like a bot. "
-            f"Do not use hashtags. Keep it under 2 sentences."
-        )
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a friendly personal Facebook user replying to friends or followers."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=60,
-            temperature=0.7
-        )
-        
-        reply = response.choices[0].message.content.strip()
-        # Remove any surrounding quotes
-        if reply.startswith('"') and reply.endswith('"'):
-            reply = reply[1:-1]
-            
+        reply = _cached_ai_reply(comment_text, author_name, api_key, profile_context)
         print(f"AI Generated Reply: {reply}")
         return reply
         
@@ -162,6 +385,60 @@ def generate_ai_reply(comment_text, author_name, api_key, profile_context=None):
         print(f"AI Generation failed: {e}")
         return None
     
+def generate_ai_replies_batch(targets, api_key):
+    """
+    Generate replies for many (comment_text, author_name, profile_context) targets,
+    AI_BATCH_SIZE per OpenAI request. Returns a dict of target -> reply; targets
+    missing from it should fall back to generate_ai_reply().
+    """
+    replies = {}
+    if not api_key or not targets:
+        return replies
+    
+    unique_targets = list(dict.fromkeys(targets))
+    client = _get_openai_client(api_key)
+    
+    for start in range(0, len(unique_targets), AI_BATCH_SIZE):
+        chunk = unique_targets[start:start + AI_BATCH_SIZE]
+        items = [
+            {"id": i, "author": author_name, "comment": comment_text, "profile": profile_context or ""}
+            for i, (comment_text, author_name, profile_context) in enumerate(chunk)
+        ]
+        try:
+            response = client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=build_messages(_BATCH_INSTRUCTIONS + json.dumps(items)),
+                response_format={"type": "json_object"},
+                max_tokens=60 * len(chunk) + 50,
+                temperature=0.7
+            )
+            data = json.loads(response.choices[0].message.content)
+            for item in data["replies"]:
+                # Anything but non-empty text (null, numbers, ...) is left to the per-comment fallback
+                if not isinstance(item.get("reply"), str):
+                    continue
+                idx = int(item["id"])
+                reply = _clean_reply(item["reply"])
+                if reply and 0 <= idx < len(chunk):
+                    replies[chunk[idx]] = reply
+        except Exception as e:
+            print(f"Batch AI generation failed (falling back to per-comment): {e}")
+    
+    print(f"AI generated {len(replies)}/{len(unique_targets)} replies in batch.")
+    return replies
+
+def find_visible_elements(driver, xpath):
+    """Return the visible elements matching an XPath using a single script call."""
+    return driver.execute_script(_FIND_VISIBLE_JS, xpath) or []
+
+def count_comments(driver):
+    """Return the number of comment/post articles currently in the DOM."""
+    return driver.execute_script(_COUNT_ARTICLES_JS)
+
+def get_page_state(driver):
+    """Return (page height, comment count); if it stops changing, nothing more is loading."""
+    return tuple(driver.execute_script(_PAGE_STATE_JS))
+
 def load_more_comments(driver):
     """
     Scrolls down and clicks 'View more comments' buttons until none are found or limit reached.
@@ -176,32 +453,29 @@ def load_more_comments(driver):
     # 1. Try to switch to "All comments"
     try:
         # Find dropdown trigger often containing "Most relevant"
-        triggers = driver.find_elements(By.XPATH, "//span[contains(text(), 'Most relevant')]")
+        triggers = find_visible_elements(driver, _MOST_RELEVANT_XPATH)
         if triggers:
-            # Check if visible
             trigger = triggers[0]
-            if trigger.is_displayed():
-                print("Found comment filter. Attempting to switch to 'All comments'...")
-                driver.execute_script("arguments[0].click();", trigger)
-                time.sleep(2)
-                
-                # Click "All comments" in the menu
-                # Note: This is an approximation. Facebook UI classes change often.
-                # We look for the text "All comments"
-                all_comments_opts = driver.find_elements(By.XPATH, "//span[contains(text(), 'All comments')]")
-                for opt in all_comments_opts:
-                    if opt.is_displayed():
-                        driver.execute_script("arguments[0].click();", opt)
-                        print("Switched to 'All comments'.")
-                        time.sleep(3)
-                        break
+            print("Found comment filter. Attempting to switch to 'All comments'...")
+            driver.execute_script("arguments[0].click();", trigger)
+            time.sleep(2)
+            
+            # Click "All comments" in the menu
+            # Note: This is an approximation. Facebook UI classes change often.
+            # We look for the text "All comments"
+            all_comments_opts = find_visible_elements(driver, _ALL_COMMENTS_XPATH)
+            if all_comments_opts:
+                driver.execute_script("arguments[0].click();", all_comments_opts[0])
+                print("Switched to 'All comments'.")
+                time.sleep(3)
     except Exception as e:
         print(f"Could not switch comment filter (non-critical): {e}")
 
     # 2. Expand View More
-    # We loop until no buttons are found or for a max number of iterations
+    # We loop until the page stops growing (same height and comment count after a
+    # pass) or for a max number of iterations
     max_loops = 50 # Increased to 50 to load more comments
-    consecutive_no_clicks = 0
+    prev_state = get_page_state(driver)
     
     for i in range(max_loops):
         try:
@@ -211,31 +485,22 @@ def load_more_comments(driver):
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
             time.sleep(1)
             
-            # Look for typical "View more comments" buttons
-            # Facebook text often: "View more comments", "View 1 more comment", "View previous comments", "See more"
-            # Also "View replies" to ensure nested comments are seen? 
+            # Look for typical "View more comments" buttons (see _VIEW_MORE_XPATH)
             # Note: Expanding EVERY reply might be too much, but user wants ALL.
-            view_more_btns = driver.find_elements(By.XPATH, 
-                "//span[contains(text(), 'View more') and contains(text(), 'comment')] | "
-                "//span[contains(text(), 'View previous comments')] | "
-                "//span[contains(text(), 'See more')] | "
-                "//div[contains(text(), 'View more comments')] | "
-                "//span[contains(text(), 'View') and contains(text(), 'replies')]")
-            
-            visible_btns = [b for b in view_more_btns if b.is_displayed()]
+            visible_btns = find_visible_elements(driver, _VIEW_MORE_XPATH)
             
             if not visible_btns:
-                consecutive_no_clicks += 1
-                if consecutive_no_clicks > 2: # Stop if we didn't find anything 3 times in a row
+                state = get_page_state(driver)
+                if state == prev_state:
                     print("No more 'View more' buttons found.")
                     break
-                else:
-                    time.sleep(2)
-                    continue
+                # Scrolling lazy-loaded more content; look again
+                prev_state = state
+                continue
             
-            consecutive_no_clicks = 0
             print(f"Found {len(visible_btns)} 'View more/replies' buttons. Clicking...")
             
+            prev_count = count_comments(driver)
             clicked_count = 0
             for btn in visible_btns:
                 try:
@@ -253,7 +518,17 @@ def load_more_comments(driver):
                  break
                 
             print(f"Clicked {clicked_count} buttons. Waiting for content reload...")
-            time.sleep(4) # Wait longer for content to load
+            try:
+                WebDriverWait(driver, CONTENT_RELOAD_TIMEOUT).until(lambda d: count_comments(d) > prev_count)
+            except TimeoutException:
+                pass # e.g. only "See more" text expansions, which don't add comments
+            time.sleep(MIN_WAIT)
+            
+            state = get_page_state(driver)
+            if state == prev_state:
+                print("Page stopped growing, all comments loaded.")
+                break
+            prev_state = state
             
         except Exception as e:
             print(f"Error during expansion: {e}")
@@ -264,36 +539,11 @@ def is_already_replied(driver, reply_btn, fb_name):
     Check if the comment has already been replied to by the user.
     """
     try:
-        # 1. Get the parent container of the comment
-        # The reply button is usually in a list of actions under the comment body
-        # Structure: Comment Div -> ... -> Actions Div -> [Like, Reply...]
-        # Replies are usually in a sibling div or a nested list.
-        
-        # We traverse up to find the main container for this comment thread
-        parent = reply_btn
-        for _ in range(6):
-            parent = parent.find_element(By.XPATH, "..")
-            # Heuristic: Container usually has role="article" or aria-label
-            if parent.get_attribute("role") == "article":
-                break
-        
-        # 2. Search for our name in valid author links within this container
-        # We avoid matching the name if it's just mentioned in text.
-        # Authors are usually links.
-        links = parent.find_elements(By.TAG_NAME, "a")
-        for link in links:
-            txt = link.text.strip()
-            # If our name is found in a link, and it's not the 'Reply' button itself
-            if fb_name.lower() in txt.lower() and len(txt) < len(fb_name) + 5:
-                # We found a link with our name.
-                # Just need to be sure it's an author name, not "Reply to [Name]"
-                # Usually author names are bold or have specific classes, but verifying that is hard.
-                # Simplest check: Is this link appearing AFTER the main comment?
-                # This is hard to determine in DOM order easily for all layouts.
-                
-                # Assume if our name appears as a link in the thread, we participated.
-                return True
-                
+        # Traverse up from the Reply button to the comment thread container
+        # (role="article", at most 6 levels) and look for our name in the
+        # author links there. Authors are usually links, so a plain mention
+        # in the text doesn't count. See _ALREADY_REPLIED_JS.
+        return bool(driver.execute_script(_ALREADY_REPLIED_JS, reply_btn, fb_name))
     except Exception as e:
         # If check fails, assume safe to reply to avoid skipping valid ones (user preference)
         # print(f"Warning: Duplicate check failed {e}")
@@ -301,17 +551,56 @@ def is_already_replied(driver, reply_btn, fb_name):
         
     return False
 
+def get_comment_authors(driver, reply_buttons):
+    """
+    Return a list of (author_name, profile_url) for each Reply button, (None, None) if unknown.
+    """
+    if not reply_buttons:
+        return []
+    
+    authors = []
+    for found in driver.execute_script(_COMMENT_AUTHORS_JS, reply_buttons):
+        if not found:
+            authors.append((None, None))
+            continue
+        author_name, href = found
+        # Clean URL (remove query params for safety/cleanliness although args might be needed)
+        if "profile.php" in href:
+            profile_url = href
+        else:
+            profile_url = href.split("?")[0]
+        authors.append((author_name, profile_url))
+    return authors
+
+# Time (time.monotonic()) the last reply was sent. Kept across posts so --delay
+# stays a minimum gap between replies in continuous/queue mode too.
+_last_reply_sent = None
+
 def reply_to_comments(driver, post_url, default_message, delay=45, openai_key=None, fb_name="You"):
     """Navigate to a post and reply to all visible comments."""
+    global _last_reply_sent
+    # Only reuse AI replies within this post, so a repeat commenter doesn't get
+    # the exact same reply on every post in continuous mode
+    _cached_ai_reply.cache_clear()
+    
     if post_url:
         print(f"Navigating to post: {post_url}")
         driver.get(post_url)
     else:
         print("No URL provided, assuming already on correct page...")
     
+    # One extra tab, reused for every profile scrape instead of opening a new one each time
+    original_window = driver.current_window_handle
+    scrape_handle = None
+    
     try:
         print("Waiting for comments to load...")
-        time.sleep(5)
+        try:
+            WebDriverWait(driver, PAGE_LOAD_TIMEOUT).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, _ARTICLE_CSS)))
+        except TimeoutException:
+            print("No comments appeared yet, continuing anyway...")
+        time.sleep(MIN_WAIT)
         
         # Load all comments
         load_more_comments(driver)
@@ -331,25 +620,58 @@ def reply_to_comments(driver, post_url, default_message, delay=45, openai_key=No
         # Note: Selectors are fragile. We try to find the "Reply" button and work backwards/sideways to find context.
         
         # Find all "Reply" buttons first as they are our action targets
-        # Expanded selector: Case insensitive "Reply", various roles.
-        reply_buttons = driver.find_elements(By.XPATH, 
-             "//div[@role='button'][translate(text(), 'REPLY', 'reply')='reply'] | "
-             "//span[translate(text(), 'REPLY', 'reply')='reply'] | "
-             "//a[@role='button'][translate(text(), 'REPLY', 'reply')='reply']")
-             
-        visible_reply_buttons = [btn for btn in reply_buttons if btn.is_displayed()]
+        visible_reply_buttons = find_visible_elements(driver, _REPLY_BUTTON_XPATH)
+        reply_total = len(visible_reply_buttons)
         
-        print(f"Found {len(visible_reply_buttons)} visible 'Reply' buttons.")
+        print(f"Found {reply_total} visible 'Reply' buttons.")
         
-        if len(visible_reply_buttons) == 0:
+        if reply_total == 0:
              print("DEBUG INFO: No 'Reply' buttons found.")
              print("Possible reasons: 1. You are not logged in. 2. Post is private/restricted. 3. Facebook changed the UI.")
              print("Check 'debug_after_loading.png' to see what the script sees.")
         
+        # Resolve every comment's author up front in a single script call
+        try:
+            comment_authors = get_comment_authors(driver, visible_reply_buttons)
+        except Exception as e:
+            print(f"Extraction warning: {e}")
+            comment_authors = [(None, None)] * reply_total
+        
+        # Pre-generate AI replies for every comment we still need to answer in one
+        # batched request. Profile contexts scraped here are cached for the loop below.
+        ai_replies = {}
+        if openai_key:
+            try:
+                driver.switch_to.new_window('tab')
+                scrape_handle = driver.current_window_handle
+                driver.switch_to.window(original_window)
+            except Exception as e:
+                # Fall back to a throwaway tab per profile
+                print(f"Could not open scrape tab (non-critical): {e}")
+                scrape_handle = None
+                driver.switch_to.window(original_window)
+            
+            targets = []
+            for btn, (name, profile_url) in zip(visible_reply_buttons, comment_authors):
+                try:
+                    if is_already_replied(driver, btn, fb_name):
+                        continue
+                    profile_context = get_profile_context(driver, profile_url, scrape_handle) if name else None
+                except Exception as e:
+                    # Don't let one comment sink the whole post; reply without profile context
+                    print(f"Extraction warning: {e}")
+                    profile_context = None
+                    try:
+                        driver.switch_to.window(original_window)
+                    except Exception:
+                        pass
+                targets.append((COMMENT_PLACEHOLDER, name or "friend", profile_context))
+            ai_replies = generate_ai_replies_batch(targets, openai_key)
+        
         count = 0
         for i, btn in enumerate(visible_reply_buttons):
             try:
-                print(f"[{i+1}/{len(visible_reply_buttons)}] Processing...")
+                print(f"[{i+1}/{reply_total}] Processing...")
                 
                 # Context Extraction (Best Effort)
                 author_name = "User"
@@ -357,41 +679,16 @@ def reply_to_comments(driver, post_url, default_message, delay=45, openai_key=No
                 profile_context = None
                 
                 try:
-                    # Move up from the Reply button to find the comment container
-                    # Reply button -> List item or Actions -> Comment Body
-                    # This is very structure dependent. 
-                    # Alternative: Look for the nearest 'dir="auto"' div which usually contains the text
-                    
-                    # Simple heuristic: The comment text is usually in a div with dir="auto" nearby the reply action
-                    # Author name is usually an anchor tag nearby
-                    
-                    # Try to extract Author Name & Profile URL
-                    # Go up to a common parent (e.g., the comment article)
-                    # We look for an anchor tag with href containing 'user', 'profile.php' or simply isn't a hashtag/post link
-                    parent_block = btn.find_element(By.XPATH, "./ancestor::div[@role='article'][1]")
-                    
-                    # Find Author Name Link
-                    # usually <a role="link" tabindex="0">Name</a> inside the header of the comment
-                    # or just the first link with text
-                    links = parent_block.find_elements(By.TAG_NAME, "a")
-                    for link in links:
-                        href = link.get_attribute("href")
-                        text = link.text
-                        if href and text and len(text) > 2 and "comment" not in href and "photo" not in href:
-                             author_name = text
-                             # Clean URL (remove query params for safety/cleanliness although args might be needed)
-                             if "profile.php" in href:
-                                 profile_url = href
-                             else:
-                                 profile_url = href.split("?")[0]
-                             
-                             print(f"Identified Author: {author_name} ({profile_url})")
-                             
-                             # GET PROFILE CONTEXT
-                             # We only do this if we have an API key (otherwise useless)
-                             if openai_key:
-                                 profile_context = get_profile_context(driver, profile_url)
-                             break
+                    # Author Name & Profile URL were resolved up front (see get_comment_authors)
+                    name, profile_url = comment_authors[i]
+                    if name:
+                        author_name = name
+                        print(f"Identified Author: {author_name} ({profile_url})")
+                        
+                        # GET PROFILE CONTEXT
+                        # We only do this if we have an API key (otherwise useless)
+                        if openai_key:
+                            profile_context = get_profile_context(driver, profile_url, scrape_handle)
                     
                 except Exception as e:
                     print(f"Extraction warning: {e}")
@@ -405,13 +702,27 @@ def reply_to_comments(driver, post_url, default_message, delay=45, openai_key=No
                     print(f"Skipping comment (Already replied by {fb_name}).")
                     continue
                 
+                # Pace replies: wait out whatever is left of the delay since the last send.
+                # Scraping and duplicate checks above already count towards it.
+                if _last_reply_sent is not None:
+                    remaining = delay - (time.monotonic() - _last_reply_sent)
+                    if remaining > 0:
+                        print(f"Waiting {remaining:.0f}s before next reply...")
+                        time.sleep(remaining)
+
                 # Click Reply
                 try:
                     btn.click()
                 except Exception:
                     driver.execute_script("arguments[0].click();", btn)
                 
-                time.sleep(2)
+                # Wait (at most the old 2s) for the reply box to take focus
+                try:
+                    WebDriverWait(driver, 2).until(
+                        lambda d: d.switch_to.active_element.get_attribute("contenteditable") == "true")
+                except TimeoutException:
+                    pass
+                time.sleep(MIN_WAIT)
                 
                 # Switch to active element (the input box)
                 active_element = driver.switch_to.active_element
@@ -423,7 +734,11 @@ def reply_to_comments(driver, post_url, default_message, delay=45, openai_key=No
                 if openai_key:
                      # Use "friend" if name extraction failed
                      target_name = author_name if author_name != "User" else "friend"
-                     ai_reply = generate_ai_reply(f"(Comment text unavailable)", target_name, openai_key, profile_context)
+                     ai_reply = ai_replies.get((COMMENT_PLACEHOLDER, target_name, profile_context))
+                     if ai_reply:
+                         print(f"AI Generated Reply: {ai_reply}")
+                     else:
+                         ai_reply = generate_ai_reply(COMMENT_PLACEHOLDER, target_name, openai_key, profile_context)
                      if ai_reply:
                          message_to_send = ai_reply
 
@@ -438,11 +753,9 @@ def reply_to_comments(driver, post_url, default_message, delay=45, openai_key=No
                 active_element.send_keys(Keys.RETURN)
                 
                 print("Reply sent.")
+                _last_reply_sent = time.monotonic()
                 count += 1
                 
-                print(f"Waiting {delay}s before next reply...")
-                time.sleep(delay)
-                
             except Exception as e:
                 print(f"Failed to reply to comment {i+1}: {e}")
                 continue
@@ -453,6 +766,76 @@ def reply_to_comments(driver, post_url, default_message, delay=45, openai_key=No
     except Exception as e:
         print(f"Error during reply process: {e}")
         return False
+    
+    finally:
+        if scrape_handle:
+            try:
+                driver.switch_to.window(scrape_handle)
+                driver.close()
+            except Exception:
+                pass
+            driver.switch_to.window(original_window)
+
+def _list_queued_files(queue_dir):
+    """Return the '.url' files in queue_dir, oldest first. Files that vanish while listing are skipped."""
+    queued = []
+    try:
+        with os.scandir(queue_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".url"):
+                    continue
+                try:
+                    if entry.is_file():
+                        queued.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass # Removed between scandir and stat
+    except OSError as e:
+        print(f"Could not list queue directory {queue_dir}: {e}")
+    return [path for _, path in sorted(queued)]
+
+# A queued file whose first line is still blank after this long is treated as
+# abandoned rather than still being written.
+QUEUE_BLANK_FILE_TIMEOUT = 60 # seconds
+
+def _quarantine_queued_file(path, reason):
+    """Rename a queued file that can't be processed to '.bad' so it isn't polled forever."""
+    bad_path = path[:-len(".url")] + ".bad"
+    print(f"Skipping queued file {os.path.basename(path)} ({reason}); moved to {os.path.basename(bad_path)}")
+    try:
+        os.replace(path, bad_path)
+    except OSError as e:
+        print(f"Could not move {os.path.basename(path)} aside: {e}")
+
+def wait_for_queued_url(queue_dir, poll_interval=2):
+    """
+    Block until a '.url' file appears in queue_dir, then consume it (oldest first)
+    and return the URL on its first line.
+    Files whose first line is still empty are left for the next poll, in case the
+    writer hasn't finished; writers should ideally write '<name>.tmp' and rename it
+    to '<name>.url' once complete. Files that can't be decoded, or stay blank for
+    QUEUE_BLANK_FILE_TIMEOUT, are renamed to '.bad'.
+    """
+    print(f"Waiting for .url files in {queue_dir} (Ctrl+C to quit)...")
+    while True:
+        for path in _list_queued_files(queue_dir):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    url = f.readline().strip()
+                if not url:
+                    # Probably still being written; try again next poll unless it's been too long
+                    if time.time() - os.path.getmtime(path) > QUEUE_BLANK_FILE_TIMEOUT:
+                        _quarantine_queued_file(path, "still empty")
+                    continue
+                os.remove(path) # Consume it so it is only processed once
+            except UnicodeDecodeError:
+                _quarantine_queued_file(path, "not valid UTF-8")
+                continue
+            except OSError as e:
+                print(f"Could not read queued file {os.path.basename(path)}: {e}")
+                continue
+            return url
+        
+        time.sleep(poll_interval)
 
 def main():
     parser = argparse.ArgumentParser(description="Facebook Auto-Commenter (Selenium + AI)")
@@ -460,6 +843,8 @@ def main():
     parser.add_argument("--comment", "-c", help="Default comment if AI fails")
     parser.add_argument("--delay", "-d", type=int, default=45, help="Delay in seconds")
     parser.add_argument("--attach", action="store_true", help="Attach to existing Chrome (localhost:9222)")
+    parser.add_argument("--queue-dir", help="Watch this directory for .url files instead of prompting for URLs "
+                             "(write them as .tmp and rename to .url when complete)")
     
     args = parser.parse_args()
     
@@ -480,6 +865,9 @@ def main():
         except KeyboardInterrupt:
              sys.exit(0)
 
+    if args.queue_dir:
+        os.makedirs(args.queue_dir, exist_ok=True)
+
     # Setup Driver
     debugger = debug_address if args.attach else None
     driver = setup_driver(debugger)
@@ -505,6 +893,12 @@ def main():
             if post_url:
                 current_url = post_url
                 post_url = None # Clear it so we don't reuse it next loop
+            elif args.queue_dir:
+                # Unattended mode: URLs are dropped into the queue directory
+                try:
+                    current_url = wait_for_queued_url(args.queue_dir)
+                except KeyboardInterrupt:
+                    break
             else:
                 try:
                     current_url = input("Enter Facebook Post URL (or 'q' to quit): ").strip()